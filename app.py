@@ -1,7 +1,11 @@
 import os
 import io
+import atexit
 import base64
+import hashlib
 import json
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
 import cv2
@@ -10,12 +14,155 @@ import fitz
 from flask import Flask, jsonify, request, send_file, abort, render_template
 from pyzbar import pyzbar
 
+from pdf_imaging import binarized, reading_order
+
 app = Flask(__name__)
 
 BASE_DIR = Path(__file__).parent
 INPUT_DIR = BASE_DIR / "input"
 OUTPUT_DIR = BASE_DIR / "output"
 
+# QR detection renders at QR_ZOOM, retrying at QR_RETRY_ZOOM if nothing is found
+# (same defaults as CompleteQRExtractor).
+QR_ZOOM = 1.5
+QR_RETRY_ZOOM = 2.5
+# Only tickets' QR codes matter; skip zbar's other symbology decoders
+QR_SYMBOLS = [pyzbar.ZBarSymbol.QRCODE]
+
+# QR detection results keyed by (sha256 of PDF bytes, zoom), so repeat lookups
+# of an unchanged PDF skip the rasterize + decode pass entirely.
+QR_CACHE_SIZE = 32
+_qr_cache = OrderedDict()
+_qr_cache_lock = threading.Lock()
+
+
+def _qr_cache_get(key):
+    with _qr_cache_lock:
+        boxes = _qr_cache.get(key)
+        if boxes is not None:
+            _qr_cache.move_to_end(key)
+        return boxes
+
+
+def _qr_cache_put(key, boxes):
+    with _qr_cache_lock:
+        _qr_cache[key] = boxes
+        _qr_cache.move_to_end(key)
+        while len(_qr_cache) > QR_CACHE_SIZE:
+            _qr_cache.popitem(last=False)
+
+
+# Open documents keyed by resolved path, shared by the preview and QR detection
+# endpoints so a PDF's xref and fonts are parsed once rather than per request.
+DOC_POOL_SIZE = 8
+_doc_pool = OrderedDict()
+_doc_pool_lock = threading.Lock()
+
+
+class _PooledDoc:
+    """An open PDF plus the file stamp and hash it was loaded from."""
+
+    def __init__(self, pdf_path):
+        stat = pdf_path.stat()
+        self.stamp = (stat.st_mtime_ns, stat.st_size)
+        pdf_bytes = pdf_path.read_bytes()
+        self.sha256 = hashlib.sha256(pdf_bytes).hexdigest()
+        self.doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        # PyMuPDF documents must not be used from two threads at once
+        self.lock = threading.RLock()
+
+    def close(self):
+        with self.lock:
+            self.doc.close()
+
+
+def _get_doc(pdf_path):
+    """Return the pooled document for pdf_path, reopening it if the file changed."""
+    key = str(pdf_path.resolve())
+    stat = pdf_path.stat()
+    with _doc_pool_lock:
+        pooled = _doc_pool.get(key)
+        if pooled is not None and pooled.stamp == (stat.st_mtime_ns, stat.st_size):
+            _doc_pool.move_to_end(key)
+            return pooled
+
+    pooled = _PooledDoc(pdf_path)
+    with _doc_pool_lock:
+        current = _doc_pool.get(key)
+        if current is not None and current.stamp == pooled.stamp:
+            # Another request opened the same file version meanwhile; share it
+            _doc_pool.move_to_end(key)
+        else:
+            # Replaced or evicted entries may still be held by in-flight
+            # requests, so they are only dropped here and PyMuPDF closes them
+            # once the last reference goes away
+            _doc_pool[key] = pooled
+            _doc_pool.move_to_end(key)
+            while len(_doc_pool) > DOC_POOL_SIZE:
+                _doc_pool.popitem(last=False)
+            return pooled
+    # Ours was never handed out, so it is safe to close
+    pooled.close()
+    return current
+
+
+@atexit.register
+def _close_doc_pool():
+    with _doc_pool_lock:
+        pooled_docs = list(_doc_pool.values())
+        _doc_pool.clear()
+    for pooled in pooled_docs:
+        pooled.close()
+
+
+# Flask serves requests on multiple threads; each keeps its own detector
+_qr_local = threading.local()
+
+
+def _qr_detector():
+    """Return this thread's OpenCV QR detector, creating it on first use."""
+    detector = getattr(_qr_local, "detector", None)
+    if detector is None:
+        detector = _qr_local.detector = cv2.QRCodeDetector()
+    return detector
+
+
+def _detect_page_qr(pooled, zoom):
+    """Detect QR codes on page 1 rendered at zoom; returns (x, y, w, h) rows in PDF points."""
+    with pooled.lock:
+        mat = fitz.Matrix(zoom, zoom)
+        # Render straight to grayscale; pyzbar only needs luminance
+        pix = pooled.doc[0].get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+
+    gray = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+
+    # OpenCV's native detector only locates the codes (no decode), which is
+    # all the preview needs; fall through to pyzbar when it misses
+    found, points = _qr_detector().detectMulti(gray)
+    if found:
+        # Axis-aligned bounds of every corner quad at once
+        lo, hi = points.min(axis=1), points.max(axis=1)
+        rects = np.hstack([lo, hi - lo]).astype(np.float64) / zoom
+        return rects[reading_order(rects)]
+
+    # Coarse pass on a half-size copy (a quarter of the pixels); ticket QRs
+    # survive area downsampling, so full resolution is only a fallback
+    small = cv2.resize(gray, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+    decoded = pyzbar.decode(small, symbols=QR_SYMBOLS)
+    scale = zoom / 2
+    if not decoded:
+        decoded = pyzbar.decode(gray, symbols=QR_SYMBOLS)
+        scale = zoom
+    if not decoded:
+        for binary in binarized(gray):
+            decoded = pyzbar.decode(binary, symbols=QR_SYMBOLS)
+            if decoded:
+                break
+
+    rects = np.array([qr.rect for qr in decoded], dtype=np.float64).reshape(-1, 4) / scale
+    # Reading order, like the extractor, so boxes[0] does not depend on zoom
+    return rects[reading_order(rects)]
+
 
 @app.route("/")
 def index():
@@ -37,11 +184,10 @@ def pdf_preview(filename):
     # Prevent path traversal
     if not pdf_path.resolve().is_relative_to(INPUT_DIR.resolve()):
         abort(404)
-    doc = fitz.open(str(pdf_path))
-    page = doc[0]
-    mat = fitz.Matrix(2, 2)
-    pix = page.get_pixmap(matrix=mat)
-    doc.close()
+    pooled = _get_doc(pdf_path)
+    with pooled.lock:
+        mat = fitz.Matrix(2, 2)
+        pix = pooled.doc[0].get_pixmap(matrix=mat)
     return send_file(io.BytesIO(pix.tobytes("png")), mimetype="image/png")
 
 
@@ -66,42 +212,36 @@ def detect_qr(filename):
         abort(404)
 
     try:
-        doc = fitz.open(str(pdf_path))
-        page = doc[0]
-        mat = fitz.Matrix(2, 2)
-        pix = page.get_pixmap(matrix=mat)
-        doc.close()
+        pooled = _get_doc(pdf_path)
+        cache_key = (pooled.sha256, QR_ZOOM)
+        boxes = _qr_cache_get(cache_key)
+        if boxes is not None:
+            return jsonify({"boxes": boxes})
 
-        img_data = pix.tobytes("png")
-        nparr = np.frombuffer(img_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-
-        decoded = pyzbar.decode(gray)
-        if not decoded:
-            _, binary = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
-            decoded = pyzbar.decode(binary)
+        rects = _detect_page_qr(pooled, QR_ZOOM)
+        if not len(rects):
+            rects = _detect_page_qr(pooled, QR_RETRY_ZOOM)
+        with pooled.lock:
+            page_rect = pooled.doc[0].rect
 
         # Match the expansion constants used by complete_qr_extractor.py
-        # (all values are at 2× resolution, matching the Matrix(2,2) render above)
-        TEXT_H = 80   # pixels captured above QR for ticket text
-        PAD    = 20   # horizontal padding each side
-        BOT    = 10   # bottom padding
-        img_h, img_w = img.shape[:2]
-
-        boxes = []
-        for qr in decoded:
-            x, y, w, h = qr.rect
-            # Expanded extraction region (mirrors extract_complete_qr_boxes logic)
-            ex = max(0, x - PAD)
-            ey = max(0, y - TEXT_H)
-            ew = min(img_w, x + w + PAD) - ex
-            eh = min(img_h, y + h + BOT) - ey
-            boxes.append({
-                "x": x // 2, "y": y // 2, "w": w // 2, "h": h // 2,
-                "ex": ex // 2, "ey": ey // 2, "ew": ew // 2, "eh": eh // 2,
-            })
+        # (in PDF points; 80/20/10 px at the original 2× render)
+        TEXT_H = 40   # points captured above QR for ticket text
+        PAD    = 10   # horizontal padding each side
+        BOT    = 5    # bottom padding
+
+        # Expanded extraction region (mirrors extract_complete_qr_boxes logic),
+        # computed for every detected QR at once
+        x, y, w, h = rects.T
+        ex = np.maximum(0, x - PAD)
+        ey = np.maximum(0, y - TEXT_H)
+        ew = np.minimum(page_rect.width, x + w + PAD) - ex
+        eh = np.minimum(page_rect.height, y + h + BOT) - ey
+        scaled = np.floor(np.stack([x, y, w, h, ex, ey, ew, eh], axis=1)).astype(int)
+        keys = ("x", "y", "w", "h", "ex", "ey", "ew", "eh")
+        boxes = [dict(zip(keys, row)) for row in scaled.tolist()]
 
+        _qr_cache_put(cache_key, boxes)
         return jsonify({"boxes": boxes})
     except Exception:
         return jsonify({"boxes": []})
@@ -10,6 +10,9 @@ Usage:
 import argparse
 import sys
 import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import fitz  # PyMuPDF
 import cv2
@@ -18,206 +21,321 @@ from PIL import Image, ImageDraw, ImageFont
 from pyzbar import pyzbar
 import io
 
+from pdf_imaging import binarized, open_pdf, reading_order, resize_image, to_pixmap
+
+
+# QR rectangles are kept as a structured array (one field per coordinate) with
+# the decoded strings in a parallel list, instead of one dict per QR code
+QR_RECT_DTYPE = np.dtype([('x', 'i4'), ('y', 'i4'), ('w', 'i4'), ('h', 'i4')])
+
 
 class CompleteQRExtractor:
-    def __init__(self, verbose=False):
+    def __init__(self, verbose=False, qr_zoom=1.5, qr_retry_zoom=2.5):
         self.verbose = verbose
+        # Detection render zoom; pages with no codes are retried at qr_retry_zoom
+        self.qr_zoom = qr_zoom
+        self.qr_retry_zoom = qr_retry_zoom
+        # OpenCV detector objects are not thread-safe; keep one per thread
+        self._local = threading.local()
+        # Ticket number font, loaded once rather than once per ticket
+        # (size increased from 24 for better visibility)
+        self._font = self._load_font(36)
+        # FreeType faces must not render from two threads at once
+        self._font_lock = threading.Lock()
         
     def log(self, message):
         """Print message if verbose mode is enabled"""
         if self.verbose:
             print(f"[INFO] {message}")
     
-    def extract_complete_qr_boxes(self, page):
-        """Extract complete QR code boxes including text above"""
-        # Convert page to image for QR detection
-        mat = fitz.Matrix(2, 2)  # 2x zoom for better detection
-        pix = page.get_pixmap(matrix=mat)
-        img_data = pix.tobytes("png")
-        
-        # Convert to cv2 image
-        nparr = np.frombuffer(img_data, np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Detect QR codes first
-        qr_regions = []
-        decoded = pyzbar.decode(gray)
-        
-        for qr in decoded:
-            x, y, w, h = qr.rect
-            # Scale back to original coordinates
-            qr_regions.append({
-                'qr_x': x // 2,
-                'qr_y': y // 2,
-                'qr_width': w // 2,
-                'qr_height': h // 2,
-                'data': qr.data.decode('utf-8') if qr.data else ''
-            })
+    def _load_font(self, size):
+        """Load the first available TrueType font, falling back to PIL's default"""
+        for path in [
+            "arial.ttf",
+            "/System/Library/Fonts/Helvetica.ttc",
+            # Common Linux font
+            "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+        ]:
+            try:
+                return ImageFont.truetype(path, size)
+            except Exception:
+                pass
+        return ImageFont.load_default()
+    
+    def _render_for_detection(self, page, zoom):
+        """Render a page to a grayscale image for QR detection"""
+        mat = fitz.Matrix(zoom, zoom)
+        # Render straight to grayscale: pyzbar only needs luminance, and this
+        # avoids both the RGB pixmap and a separate color conversion pass
+        pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+        return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+    
+    def _qr_detector(self):
+        """Return this thread's OpenCV QR detector, creating it on first use"""
+        detector = getattr(self._local, 'qr_detector', None)
+        if detector is None:
+            detector = cv2.QRCodeDetectorAruco()
+            self._local.qr_detector = detector
+        return detector
+    
+    def _detect_with_opencv(self, gray):
+        """Detect and decode all QR codes in one native OpenCV pass.
         
-        # If no QR codes found, try with preprocessing
-        if not qr_regions:
-            _, binary = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
-            decoded = pyzbar.decode(binary)
-            
-            for qr in decoded:
-                x, y, w, h = qr.rect
-                qr_regions.append({
-                    'qr_x': x // 2,
-                    'qr_y': y // 2,
-                    'qr_width': w // 2,
-                    'qr_height': h // 2,
-                    'data': qr.data.decode('utf-8') if qr.data else ''
-                })
-        
-        # Now expand each QR region to include text above
-        complete_boxes = []
+        Returns (x, y, w, h, data) tuples at render resolution, or an empty
+        list if any located code could not be decoded.
+        """
+        found, texts, points, _ = self._qr_detector().detectAndDecodeMulti(gray)
+        if not found:
+            return []
         
-        for qr in qr_regions:
-            # Estimate text area above QR code
-            # Typically text takes about 60-80 pixels above the QR code
-            text_height = 80
-            side_padding = 20
-            bottom_padding = 10
-            
-            # Calculate complete box coordinates
-            box_x = max(0, qr['qr_x'] - side_padding)
-            box_y = max(0, qr['qr_y'] - text_height)
-            box_width = qr['qr_width'] + (2 * side_padding)
-            box_height = qr['qr_height'] + text_height + bottom_padding
-            
-            # Ensure we don't go beyond page boundaries
-            page_rect = page.rect
-            box_x = max(0, box_x)
-            box_y = max(0, box_y)
-            box_width = min(box_width, page_rect.width - box_x)
-            box_height = min(box_height, page_rect.height - box_y)
-            
-            complete_boxes.append({
-                'x': box_x,
-                'y': box_y,
-                'width': int(box_width),
-                'height': int(box_height),
-                'qr_data': qr['data'],
-                'image': None
-            })
-            
-            self.log(f"QR box expanded from ({qr['qr_x']}, {qr['qr_y']}) "
-                    f"to ({box_x}, {box_y}) size: {box_width}x{box_height}")
-        
-        # Extract the complete box images
-        for box in complete_boxes:
-            # Define clip rectangle for the complete box
-            clip = fitz.Rect(
-                box['x'],
-                box['y'],
-                box['x'] + box['width'],
-                box['y'] + box['height']
-            )
+        results = []
+        for text, quad in zip(texts, points):
+            if not text:
+                return []
+            x, y = quad.min(axis=0)
+            w, h = quad.max(axis=0) - (x, y)
+            results.append((int(x), int(y), int(w), int(h), text))
+        return results
+    
+    def _detect_with_pyzbar(self, image):
+        """Decode QR codes with pyzbar as (x, y, w, h, data) tuples"""
+        return [
+            (*qr.rect, qr.data.decode('utf-8') if qr.data else '')
+            for qr in pyzbar.decode(image, symbols=[pyzbar.ZBarSymbol.QRCODE])
+        ]
+    
+    def detect_qr_codes(self, gray, zoom):
+        """Detect QR codes in a grayscale page render made at zoom.
+        
+        Returns (rects, data): a QR_RECT_DTYPE array in page coordinates and
+        the decoded strings in the same order. Touches no PyMuPDF objects, so
+        it is safe to run on worker threads.
+        """
+        detections = self._detect_with_opencv(gray)
+        
+        # Fall back to pyzbar, then pyzbar on thresholded copies
+        if not detections:
+            detections = self._detect_with_pyzbar(gray)
+        if not detections:
+            for binary in binarized(gray):
+                detections = self._detect_with_pyzbar(binary)
+                if detections:
+                    break
+        
+        # Detectors disagree on result order; number tickets in reading order
+        detections = [detections[i] for i in reading_order([d[:4] for d in detections])]
+        
+        # Scale all rectangles back to original coordinates in one step
+        rects = np.zeros(len(detections), dtype=QR_RECT_DTYPE)
+        if detections:
+            scaled = np.array([d[:4] for d in detections], dtype=np.float64) / zoom
+            for i, field in enumerate(QR_RECT_DTYPE.names):
+                rects[field] = scaled[:, i]
+        return rects, [d[4] for d in detections]
+    
+    def _expand_qr_boxes(self, page, rects, data):
+        """Expand detected QR regions to include the text above and crop them"""
+        # Estimate text area above QR code
+        # Typically text takes about 60-80 pixels above the QR code
+        text_height = 80
+        side_padding = 20
+        bottom_padding = 10
+        
+        # Calculate complete box coordinates for every QR at once, keeping
+        # within page boundaries
+        page_rect = page.rect
+        box_x = np.maximum(0, rects['x'] - side_padding)
+        box_y = np.maximum(0, rects['y'] - text_height)
+        box_width = np.minimum(rects['w'] + 2 * side_padding,
+                               page_rect.width - box_x).astype(int)
+        box_height = np.minimum(rects['h'] + text_height + bottom_padding,
+                                page_rect.height - box_y).astype(int)
+        
+        complete_boxes = []
+        for i, qr_data in enumerate(data):
+            x, y = int(box_x[i]), int(box_y[i])
+            width, height = int(box_width[i]), int(box_height[i])
+            self.log(f"QR box expanded from ({rects['x'][i]}, {rects['y'][i]}) "
+                    f"to ({x}, {y}) size: {width}x{height}")
             
             # Get high-resolution image of the complete box
+            clip = fitz.Rect(x, y, x + width, y + height)
             pix = page.get_pixmap(clip=clip, matrix=fitz.Matrix(2, 2))
-            box['image'] = pix.tobytes("png")
-            
+            complete_boxes.append({
+                'x': x,
+                'y': y,
+                'width': width,
+                'height': height,
+                'qr_data': qr_data,
+                'image': pix.tobytes("png")
+            })
+        
         return complete_boxes
     
+    def _retry_detection(self, page):
+        """Re-detect a page at qr_retry_zoom after nothing was found at qr_zoom"""
+        if self.qr_retry_zoom <= self.qr_zoom:
+            return np.zeros(0, dtype=QR_RECT_DTYPE), []
+        self.log(f"No QR codes at {self.qr_zoom}x, retrying at {self.qr_retry_zoom}x")
+        gray = self._render_for_detection(page, self.qr_retry_zoom)
+        return self.detect_qr_codes(gray, self.qr_retry_zoom)
+    
+    def extract_complete_qr_boxes(self, page, detections=None):
+        """Extract complete QR code boxes including text above
+        
+        detections is an optional (rects, data) result of detect_qr_codes
+        for this page at qr_zoom.
+        """
+        if detections is None:
+            gray = self._render_for_detection(page, self.qr_zoom)
+            detections = self.detect_qr_codes(gray, self.qr_zoom)
+        rects, data = detections
+        if not data:
+            rects, data = self._retry_detection(page)
+        return self._expand_qr_boxes(page, rects, data)
+    
+    def _scan_pages(self, doc, threads=1):
+        """Yield (page_num, qr_boxes) for every page, in page order.
+        
+        PyMuPDF is not thread-safe, so rendering and cropping stay on this
+        thread; only the QR decode (OpenCV/libzbar, which release the GIL)
+        is fanned out to the worker threads.
+        """
+        total_pages = len(doc)
+        if threads <= 1:
+            for page_num in range(total_pages):
+                yield page_num, self.extract_complete_qr_boxes(doc[page_num])
+            return
+        
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            # Bound the number of rendered pages held in memory at once
+            pending = deque()
+            for page_num in range(total_pages):
+                gray = self._render_for_detection(doc[page_num], self.qr_zoom)
+                future = executor.submit(self.detect_qr_codes, gray, self.qr_zoom)
+                pending.append((page_num, future))
+                if len(pending) >= threads * 2:
+                    done_num, future = pending.popleft()
+                    yield done_num, self.extract_complete_qr_boxes(doc[done_num], future.result())
+            while pending:
+                done_num, future = pending.popleft()
+                yield done_num, self.extract_complete_qr_boxes(doc[done_num], future.result())
+    
     def mask_awaiting_payment(self, img, ticket_number=None):
         """Mask out 'Awaiting Payment' text and add ticket number"""
         # Convert to numpy array for processing
         img_array = np.array(img)
         height, width = img_array.shape[:2]
         
-        # Create PIL image for drawing
-        img_pil = Image.fromarray(img_array)
-        draw = ImageDraw.Draw(img_pil)
-        
         # Mask only the "Awaiting Payment" text area (typically in upper-middle portion)
         # This preserves the ticket code at the very top
         mask_y_start = int(height * 0.15)  # Start below ticket code
         mask_y_end = int(height * 0.30)    # End well before QR code area (reduced from 0.45)
         
-        # Draw white rectangle only over "Awaiting Payment" area
-        draw.rectangle([0, mask_y_start, width, mask_y_end], fill=(255, 255, 255))
+        # White out the "Awaiting Payment" rows in place (end row inclusive)
+        img_array[mask_y_start:mask_y_end + 1] = 255
+        
+        # Create PIL image for drawing
+        img_pil = Image.fromarray(img_array)
+        draw = ImageDraw.Draw(img_pil)
         
         # Add ticket number if provided
         if ticket_number is not None:
-            # Try to use a nice font with larger size for better clarity
-            font_size = 36  # Increased from 24 for better visibility
-            try:
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                try:
-                    font = ImageFont.truetype("/System/Library/Fonts/Helvetica.ttc", font_size)
-                except:
-                    try:
-                        # Try common Linux fonts
-                        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", font_size)
-                    except:
-                        # Use default font but try to make it larger
-                        font = ImageFont.load_default()
+            font = self._font
             
             # Format ticket number with leading zeros
             text = f"{ticket_number:03d}"
             
-            # Get text dimensions
-            bbox = draw.textbbox((0, 0), text, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            
-            # Position in the white space we just created (centered)
-            x = (width - text_width) // 2
-            y = mask_y_start + ((mask_y_end - mask_y_start - text_height) // 2)
-            
             # Draw the ticket number with improved clarity
             # Add a subtle outline for better contrast and clarity
             outline_color = (128, 128, 128)  # Light gray outline
             text_color = (0, 0, 0)  # Black text
             
-            # Draw outline (offset by 1 pixel in each direction)
-            for adj_x, adj_y in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-                draw.text((x + adj_x, y + adj_y), text, font=font, fill=outline_color)
-            
-            # Draw the main text
-            draw.text((x, y), text, font=font, fill=text_color)
+            with self._font_lock:
+                # Get text dimensions
+                bbox = draw.textbbox((0, 0), text, font=font)
+                text_width = bbox[2] - bbox[0]
+                text_height = bbox[3] - bbox[1]
+                
+                # Position in the white space we just created (centered)
+                x = (width - text_width) // 2
+                y = mask_y_start + ((mask_y_end - mask_y_start - text_height) // 2)
+                
+                # Draw text and its 1 pixel outline in a single pass
+                draw.text((x, y), text, font=font, fill=text_color,
+                          stroke_width=1, stroke_fill=outline_color)
         
         return img_pil
     
-    def _place_box_on_page(self, page, box_image_bytes, qr_scale=1.0,
-                            qr_x=None, qr_y=None,
-                            qr_position='right', qr_margin=20,
-                            design_width=None, design_height=None):
-        """Place a QR box image onto a page. Uses absolute coords if qr_x/qr_y given."""
-        box_img = Image.open(io.BytesIO(box_image_bytes))
-        new_width = int(box_img.width * qr_scale)
-        new_height = int(box_img.height * qr_scale)
-        box_img = box_img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    def _prepare_boxes(self, boxes, qr_scale, mask, start_number, threads=1):
+        """Yield each QR box decoded, masked and scaled, in order.
+        
+        This is PIL/OpenCV work only, so it runs on worker threads; inserting
+        the results into the output PDF stays with the caller.
+        """
+        def prepare(box_idx):
+            box_image = Image.open(io.BytesIO(boxes[box_idx]['image']))
+            if mask:
+                ticket_num = start_number + box_idx if start_number is not None else None
+                box_image = self.mask_awaiting_payment(box_image, ticket_num)
+            return self._scale_box(box_image, qr_scale)
+        
+        if threads <= 1:
+            for box_idx in range(len(boxes)):
+                yield prepare(box_idx)
+            return
+        
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            # Bound the number of prepared boxes held in memory at once
+            pending = deque()
+            for box_idx in range(len(boxes)):
+                pending.append(executor.submit(prepare, box_idx))
+                if len(pending) >= threads * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def _scale_box(self, box_image, qr_scale):
+        """Decode a QR box image if needed and resize it by qr_scale"""
+        if isinstance(box_image, bytes):
+            box_image = Image.open(io.BytesIO(box_image))
+        new_width = int(box_image.width * qr_scale)
+        new_height = int(box_image.height * qr_scale)
+        return resize_image(box_image, (new_width, new_height))
+
+    def _insert_box(self, page, box_img, qr_x=None, qr_y=None,
+                    qr_position='right', qr_margin=20,
+                    design_width=None, design_height=None):
+        """Insert an already-scaled QR box image at its placement(s) on a page"""
+        new_width, new_height = box_img.size
+        box_pixmap = to_pixmap(box_img)
 
         if qr_x is not None and qr_y is not None:
-            box_x, box_y = qr_x, qr_y
+            placements = [(qr_x, qr_y)]
         else:
             dw = design_width or page.rect.width
             dh = design_height or page.rect.height
-            if qr_position == 'left':
-                box_x = qr_margin
-            else:  # right
-                box_x = dw - new_width - qr_margin
-            box_y = dh - new_height - qr_margin
-            box_x = max(0, box_x)
-            box_y = max(0, box_y)
+            sides = ['left', 'right'] if qr_position == 'both' else [qr_position]
+            placements = []
+            for side in sides:
+                if side == 'left':
+                    box_x = qr_margin
+                else:  # right
+                    box_x = dw - new_width - qr_margin
+                box_y = dh - new_height - qr_margin
+                placements.append((max(0, box_x), max(0, box_y)))
 
-        buf = io.BytesIO()
-        box_img.save(buf, format='PNG')
-        buf.seek(0)
-        box_rect = fitz.Rect(box_x, box_y, box_x + new_width, box_y + new_height)
-        page.insert_image(box_rect, stream=buf.read(), overlay=True)
-        self.log(f"  Placed QR box at ({box_x}, {box_y}) size: {new_width}x{new_height}")
+        for box_x, box_y in placements:
+            box_rect = fitz.Rect(box_x, box_y, box_x + new_width, box_y + new_height)
+            page.insert_image(box_rect, pixmap=box_pixmap, overlay=True)
+            self.log(f"  Placed QR box at ({box_x}, {box_y}) size: {new_width}x{new_height}")
 
     def process_pdf(self, pdf_path, design_path, output_path, qr_scale=1.0, qr_margin=20,
                     qr_position='both', start_number=None, mask_awaiting=True,
-                    qr_x=None, qr_y=None):
+                    qr_x=None, qr_y=None, threads=None):
         """Main processing function"""
         self.log(f"Opening PDF: {pdf_path}")
-        doc = fitz.open(pdf_path)
+        doc = open_pdf(pdf_path)
         
         self.log(f"Loading design template: {design_path}")
         design = Image.open(design_path).convert('RGBA')
@@ -229,21 +347,35 @@ class CompleteQRExtractor:
         total_pages = len(doc)
         total_tickets = 0
         all_qr_boxes = []
+        if threads is None:
+            threads = os.cpu_count() or 1
         
-        self.log(f"Processing {total_pages} pages")
+        self.log(f"Processing {total_pages} pages ({threads} worker threads)")
         
-        # First, collect all QR boxes
-        for page_num in range(total_pages):
-            self.log(f"Scanning page {page_num + 1}/{total_pages}")
-            page = doc[page_num]
-            qr_boxes = self.extract_complete_qr_boxes(page)
+        # First, collect all QR boxes (in page order)
+        for page_num, qr_boxes in self._scan_pages(doc, min(threads, total_pages)):
+            self.log(f"Scanned page {page_num + 1}/{total_pages}")
             all_qr_boxes.extend(qr_boxes)
             self.log(f"Found {len(qr_boxes)} complete QR boxes on page {page_num + 1}")
         
         self.log(f"Total QR boxes found: {len(all_qr_boxes)}")
         
+        # The design is identical on every ticket; convert it once
+        design_pixmap = to_pixmap(design)
+        
+        # Decode, mask and scale the boxes on worker threads while this
+        # thread builds the output pages (PyMuPDF stays single-threaded)
+        prepared_boxes = self._prepare_boxes(
+            all_qr_boxes, qr_scale,
+            mask=mask_awaiting or start_number is not None,
+            start_number=start_number,
+            threads=min(threads, len(all_qr_boxes))
+        )
+        
+        design_xref = 0
+        
         # Always create one ticket per QR code
-        for box_idx, box in enumerate(all_qr_boxes):
+        for box_idx, box_img in enumerate(prepared_boxes):
             total_tickets += 1
             self.log(f"Creating ticket {total_tickets} for QR box {box_idx + 1}")
             
@@ -253,50 +385,27 @@ class CompleteQRExtractor:
                 height=design_height
             )
             
-            # Insert the design template
-            design_buffer = io.BytesIO()
-            design.save(design_buffer, format='PNG')
-            design_buffer.seek(0)
-            
-            new_page.insert_image(
+            # Insert the design template; it is embedded on the first page
+            # and later pages reference that same image object by xref
+            design_xref = new_page.insert_image(
                 new_page.rect,
-                stream=design_buffer.read(),
+                pixmap=design_pixmap,
+                xref=design_xref,
                 overlay=False
             )
             
-            # Load QR box bytes; apply mask if needed
-            box_image_bytes = box['image']
-            ticket_num = start_number + total_tickets - 1 if start_number is not None else None
-            if mask_awaiting or start_number is not None:
-                masked = self.mask_awaiting_payment(Image.open(io.BytesIO(box_image_bytes)), ticket_num)
-                buf = io.BytesIO()
-                masked.save(buf, format='PNG')
-                box_image_bytes = buf.getvalue()
-
-            if qr_x is not None and qr_y is not None:
-                self._place_box_on_page(new_page, box_image_bytes,
-                                        qr_scale=qr_scale, qr_x=qr_x, qr_y=qr_y)
-            else:
-                positions_to_place = []
-                if qr_position == 'left':
-                    positions_to_place.append('left')
-                elif qr_position == 'right':
-                    positions_to_place.append('right')
-                elif qr_position == 'both':
-                    positions_to_place.extend(['left', 'right'])
-                for pos in positions_to_place:
-                    self._place_box_on_page(new_page, box_image_bytes,
-                                            qr_scale=qr_scale, qr_position=pos,
-                                            qr_margin=qr_margin,
-                                            design_width=design_width,
-                                            design_height=design_height)
+            self._insert_box(new_page, box_img, qr_x=qr_x, qr_y=qr_y,
+                             qr_position=qr_position, qr_margin=qr_margin,
+                             design_width=design_width,
+                             design_height=design_height)
 
             if start_number is not None:
-                self.log(f"  Added ticket number: {ticket_num:03d} in QR box")
+                self.log(f"  Added ticket number: {start_number + box_idx:03d} in QR box")
         
         # Save the output document
         self.log(f"Saving {total_tickets} tickets to: {output_path}")
-        output_doc.save(output_path)
+        output_doc.save(output_path, garbage=4, deflate=True, deflate_images=True,
+                        deflate_fonts=True, clean=True)
         output_doc.close()
         doc.close()
         
@@ -325,6 +434,9 @@ def main():
                        help='Absolute X coordinate for QR box on design (overrides --qr-position)')
     parser.add_argument('--qr-y', type=int, default=None,
                        help='Absolute Y coordinate for QR box on design (overrides --qr-position)')
+    parser.add_argument('--threads', type=int, default=None,
+                       help='Worker threads for QR detection and ticket assembly '
+                            '(default: CPU count, 1 disables)')
     parser.add_argument('-v', '--verbose', action='store_true',
                        help='Enable verbose output')
     
@@ -343,6 +455,10 @@ def main():
         print("Error: QR scale must be positive")
         sys.exit(1)
     
+    if args.threads is not None and args.threads < 1:
+        print("Error: --threads must be at least 1")
+        sys.exit(1)
+    
     # Create output directory if needed
     output_dir = os.path.dirname(args.output)
     if output_dir and not os.path.exists(output_dir):
@@ -361,7 +477,8 @@ def main():
             start_number=args.start_number,
             mask_awaiting=not args.no_mask,
             qr_x=args.qr_x,
-            qr_y=args.qr_y
+            qr_y=args.qr_y,
+            threads=args.threads
         )
         
         if success:
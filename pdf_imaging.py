@@ -0,0 +1,90 @@
+"""
+Image and PDF helpers shared by complete_qr_extractor.py, ticket_generator.py
+and app.py.
+
+Only depends on PyMuPDF, OpenCV, NumPy and Pillow, so importing it does not
+pull in pyzbar.
+"""
+
+import mmap
+import os
+
+import cv2
+import fitz
+import numpy as np
+from PIL import Image
+
+
+def open_pdf(pdf_path):
+    """Open a PDF over a read-only memory map of the file.
+
+    The kernel pages the file in on demand instead of MuPDF reading it up
+    front; the document holds the mapping until it is garbage collected.
+    Older PyMuPDF releases (e.g. 1.23.8) reject memoryview streams with a
+    TypeError; those open the file by path instead.
+    """
+    with open(pdf_path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        return fitz.open(stream=memoryview(mm), filetype="pdf")
+    except TypeError:
+        return fitz.open(pdf_path)
+
+
+def to_pixmap(img):
+    """Wrap a PIL image as a PyMuPDF pixmap, avoiding a PNG encode/decode."""
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    if img.mode == "RGBA":
+        # MuPDF expects premultiplied alpha samples
+        return fitz.Pixmap(fitz.csRGB, img.width, img.height, img.convert("RGBa").tobytes(), True)
+    return fitz.Pixmap(fitz.csRGB, img.width, img.height, img.tobytes(), False)
+
+
+def resize_image(img, size):
+    """Lanczos-resize a PIL image with OpenCV's SIMD-accelerated resampler."""
+    if img.mode not in ("L", "RGB", "RGBA"):
+        img = img.convert("RGBA")
+    arr = np.asarray(img)
+    # For large reductions, area-average down to 2x the target first (as
+    # Pillow's reducing_gap=2.0 does) so Lanczos samples a much smaller source
+    if arr.shape[1] > 2 * size[0] and arr.shape[0] > 2 * size[1]:
+        arr = cv2.resize(arr, (2 * size[0], 2 * size[1]), interpolation=cv2.INTER_AREA)
+    resized = cv2.resize(arr, size, interpolation=cv2.INTER_LANCZOS4)
+    return Image.fromarray(resized)
+
+
+def binarized(gray):
+    """Yield thresholded copies of a grayscale render for fallback decodes.
+
+    The fixed mid-grey cut comes first: on a mostly white ticket page Otsu
+    separates the paper from everything else, so its cut lands just under
+    white and merges low-contrast modules into one block. Otsu still follows
+    for scans whose overall brightness is far off, where 127 misses.
+    """
+    yield cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)[1]
+    yield cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)[1]
+
+
+def reading_order(rects):
+    """Indices that sort (x, y, w, h) rects into reading order.
+
+    Codes whose tops lie within half the median code height of a row's first
+    code share that row and are read left to right, so sub-point differences
+    between detectors cannot swap neighbours on the same row.
+    """
+    rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+    if len(rects) < 2:
+        return np.arange(len(rects))
+    tolerance = np.median(rects[:, 3]) / 2
+    rows = np.empty(len(rects), dtype=np.intp)
+    row, row_top = 0, None
+    for i in np.argsort(rects[:, 1], kind="stable"):
+        if row_top is None:
+            row_top = rects[i, 1]
+        elif rects[i, 1] - row_top > tolerance:
+            row, row_top = row + 1, rects[i, 1]
+        rows[i] = row
+    return np.lexsort((rects[:, 0], rows))
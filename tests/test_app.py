@@ -2,6 +2,7 @@ import pytest
 import os
 import sys
 import json
+from collections import OrderedDict
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 @pytest.fixture
@@ -15,6 +16,8 @@ def client(tmp_path, monkeypatch):
     monkeypatch.setattr(flask_app, "BASE_DIR", tmp_path)
     monkeypatch.setattr(flask_app, "INPUT_DIR", tmp_path / "input")
     monkeypatch.setattr(flask_app, "OUTPUT_DIR", tmp_path / "output")
+    monkeypatch.setattr(flask_app, "_qr_cache", OrderedDict())
+    monkeypatch.setattr(flask_app, "_doc_pool", OrderedDict())
     flask_app.app.config["TESTING"] = True
     with flask_app.app.test_client() as c:
         yield c
@@ -41,13 +44,120 @@ def test_detect_qr_404_for_missing_file(client):
 def test_detect_qr_returns_box_or_empty(client, monkeypatch):
     """detect-qr returns a list (may be empty for a blank PDF)."""
     # app.py uses `from pyzbar import pyzbar` so the live name is pyzbar.pyzbar.decode
-    monkeypatch.setattr("pyzbar.pyzbar.decode", lambda img: [])
+    monkeypatch.setattr("pyzbar.pyzbar.decode", lambda img, **kwargs: [])
     resp = client.get("/api/detect-qr/test.pdf")
     assert resp.status_code == 200
     data = resp.get_json()
     assert isinstance(data["boxes"], list)
 
 
+def test_detect_qr_caches_results_per_pdf(client, tmp_path, monkeypatch):
+    """A second detect-qr call for an unchanged PDF reuses the cached boxes."""
+    import fitz
+    doc = fitz.open()
+    doc.new_page()
+    doc.save(str(tmp_path / "input" / "blank.pdf"))
+    doc.close()
+
+    calls = []
+    monkeypatch.setattr("pyzbar.pyzbar.decode", lambda img, **kwargs: calls.append(img) or [])
+    first = client.get("/api/detect-qr/blank.pdf").get_json()
+    decode_calls = len(calls)
+    second = client.get("/api/detect-qr/blank.pdf").get_json()
+    assert first == second == {"boxes": []}
+    assert decode_calls > 0
+    assert len(calls) == decode_calls
+
+
+def test_pooled_doc_reused_until_file_changes(client, tmp_path):
+    """Unchanged PDFs share one open document; a rewritten file is reopened."""
+    import fitz
+    import app as flask_app
+    pdf_path = tmp_path / "input" / "pooled.pdf"
+    doc = fitz.open()
+    doc.new_page()
+    doc.save(str(pdf_path))
+    doc.close()
+
+    first = flask_app._get_doc(pdf_path)
+    assert flask_app._get_doc(pdf_path) is first
+
+    doc = fitz.open()
+    doc.new_page()
+    doc.new_page()
+    doc.save(str(pdf_path))
+    doc.close()
+
+    second = flask_app._get_doc(pdf_path)
+    assert second is not first
+    assert len(second.doc) == 2
+    # A request may still hold the replaced document; it must stay usable
+    assert not first.doc.is_closed
+    assert len(first.doc) == 1
+
+
+def test_concurrent_pool_misses_share_one_open_document(client, tmp_path, monkeypatch):
+    """Two requests missing the pool for the same PDF never close each other's document."""
+    import threading
+    import fitz
+    import app as flask_app
+    pdf_path = tmp_path / "input" / "race.pdf"
+    doc = fitz.open()
+    doc.new_page()
+    doc.save(str(pdf_path))
+    doc.close()
+
+    # Hold both threads after opening so they race to insert into the pool
+    barrier = threading.Barrier(2, timeout=5)
+
+    class BarrierDoc(flask_app._PooledDoc):
+        def __init__(self, path):
+            super().__init__(path)
+            barrier.wait()
+
+    monkeypatch.setattr(flask_app, "_PooledDoc", BarrierDoc)
+    results, errors = [], []
+
+    def worker():
+        try:
+            pooled = flask_app._get_doc(pdf_path)
+            with pooled.lock:
+                results.append((pooled, pooled.doc[0].rect))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert results[0][0] is results[1][0]
+    assert not results[0][0].doc.is_closed
+    assert flask_app._get_doc(pdf_path) is results[0][0]
+
+
+def test_evicted_pooled_doc_stays_usable(client, tmp_path, monkeypatch):
+    """LRU eviction drops a document from the pool without closing it under its holder."""
+    import fitz
+    import app as flask_app
+    monkeypatch.setattr(flask_app, "DOC_POOL_SIZE", 1)
+    paths = []
+    for name in ("a.pdf", "b.pdf"):
+        doc = fitz.open()
+        doc.new_page()
+        doc.save(str(tmp_path / "input" / name))
+        doc.close()
+        paths.append(tmp_path / "input" / name)
+
+    held = flask_app._get_doc(paths[0])
+    flask_app._get_doc(paths[1])
+    assert list(flask_app._doc_pool) == [str(paths[1].resolve())]
+    with held.lock:
+        assert len(held.doc) == 1
+
+
 def test_generate_writes_ticket_gen_sh(client, tmp_path):
     payload = {
         "pdf": "test.pdf",
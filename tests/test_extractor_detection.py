@@ -0,0 +1,116 @@
+import cv2
+import fitz
+import numpy as np
+import pytest
+
+from complete_qr_extractor import CompleteQRExtractor
+
+
+def _low_contrast_page():
+    """A4 at 1.5x: white page with one mid-grey QR-sized checkerboard (values 120/160)."""
+    gray = np.full((1263, 893), 255, dtype=np.uint8)
+    yy, xx = np.indices((150, 150))
+    gray[150:300, 150:300] = np.where((yy // 6 + xx // 6) % 2, 120, 160)
+    return gray
+
+
+def test_low_contrast_code_gets_thresholded_retry(monkeypatch):
+    """A mostly white page still gets a thresholded pass when both detectors miss."""
+    extractor = CompleteQRExtractor()
+    monkeypatch.setattr(extractor, "_detect_with_opencv", lambda img: [])
+    seen = []
+
+    def fake_pyzbar(img):
+        seen.append(img.copy())
+        return [] if len(seen) == 1 else [(150, 150, 150, 150, "T1")]
+
+    monkeypatch.setattr(extractor, "_detect_with_pyzbar", fake_pyzbar)
+    rects, data = extractor.detect_qr_codes(_low_contrast_page(), 1.5)
+
+    assert len(seen) == 2
+    # The grey modules must land on both sides of the cut, not merge into a block
+    assert set(np.unique(seen[1][150:300, 150:300])) == {0, 255}
+    assert data == ["T1"]
+    assert rects[0]["x"] == 100 and rects[0]["w"] == 100
+
+
+def test_codes_on_one_row_are_numbered_left_to_right(monkeypatch):
+    """Sub-point height differences between codes on a row do not reorder them."""
+    extractor = CompleteQRExtractor()
+    monkeypatch.setattr(extractor, "_detect_with_opencv",
+                        lambda img: [(600, 148, 180, 180, "RIGHT"), (75, 150, 180, 180, "LEFT")])
+    _, data = extractor.detect_qr_codes(np.full((100, 100), 255, dtype=np.uint8), 1.5)
+    assert data == ["LEFT", "RIGHT"]
+
+
+def _square_pdf(tmp_path, squares_per_page):
+    """PDF whose pages carry solid black squares given as (x, y, size) in points."""
+    path = tmp_path / "squares.pdf"
+    doc = fitz.open()
+    for squares in squares_per_page:
+        page = doc.new_page()
+        for x, y, size in squares:
+            page.draw_rect(fitz.Rect(x, y, x + size, y + size), color=None, fill=(0, 0, 0))
+    doc.save(str(path))
+    doc.close()
+    return fitz.open(str(path))
+
+
+def _square_detector(min_px=0):
+    """Stand-in for OpenCV's QR detector: reports dark squares at least min_px wide."""
+    def detect(gray):
+        _, _, stats, _ = cv2.connectedComponentsWithStats((gray < 128).astype(np.uint8))
+        return [(int(x), int(y), int(w), int(h), f"SQ{x}") for x, y, w, h, _ in stats[1:] if w >= min_px]
+    return detect
+
+
+def _scanning_extractor(monkeypatch, min_px=0):
+    extractor = CompleteQRExtractor()
+    monkeypatch.setattr(extractor, "_detect_with_opencv", _square_detector(min_px))
+    monkeypatch.setattr(extractor, "_detect_with_pyzbar", lambda img: [])
+    renders = []
+    render = extractor._render_for_detection
+
+    def recording_render(page, zoom):
+        renders.append((page.number, zoom))
+        return render(page, zoom)
+
+    monkeypatch.setattr(extractor, "_render_for_detection", recording_render)
+    return extractor, renders
+
+
+def _box_geometry(scan):
+    return [(page_num, [(b["x"], b["y"], b["width"], b["height"]) for b in boxes])
+            for page_num, boxes in scan]
+
+
+def test_threaded_scan_matches_serial_page_order(tmp_path, monkeypatch):
+    """threads > 1 yields the same boxes, in the same page order, as the serial path."""
+    pages = [[(100 + 20 * p, 200, 80), (400, 200, 80)] for p in range(7)]
+    doc = _square_pdf(tmp_path, pages)
+    extractor, _ = _scanning_extractor(monkeypatch)
+
+    serial = _box_geometry(extractor._scan_pages(doc, threads=1))
+    threaded = _box_geometry(extractor._scan_pages(doc, threads=3))
+
+    assert threaded == serial
+    assert [page_num for page_num, _ in serial] == list(range(7))
+    # 20 pt side padding, 80 pt text band above, 10 pt below
+    assert serial[3][1] == [(140, 120, 120, 170), (380, 120, 120, 170)]
+
+
+@pytest.mark.parametrize("threads", [1, 3])
+def test_retry_zoom_only_for_pages_with_nothing_found(tmp_path, monkeypatch, threads):
+    """Only an empty first pass triggers the 2.5x render, and its hits are scaled by 2.5."""
+    # 80 pt renders 120 px at 1.5x; 40 pt is 60 px at 1.5x and 100 px at 2.5x
+    doc = _square_pdf(tmp_path, [[(100, 200, 80)], [(300, 400, 40)], []])
+    extractor, renders = _scanning_extractor(monkeypatch, min_px=90)
+
+    scan = _box_geometry(extractor._scan_pages(doc, threads=threads))
+
+    assert sorted(renders) == [(0, 1.5), (1, 1.5), (1, 2.5), (2, 1.5), (2, 2.5)]
+    assert scan == [
+        (0, [(80, 120, 120, 170)]),
+        (1, [(280, 320, 80, 130)]),
+        (2, []),
+    ]
@@ -11,8 +11,9 @@ sys.modules.setdefault('fitz', MagicMock())
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-import fitz  # now the mock
-fitz.Rect = lambda x0, y0, x1, y1: MagicMock(x0=x0, y0=y0, x1=x1, y1=y1)
+import fitz  # the mock, unless conftest already imported the real module
+if isinstance(fitz, MagicMock):
+    fitz.Rect = lambda x0, y0, x1, y1: MagicMock(x0=x0, y0=y0, x1=x1, y1=y1)
 
 from complete_qr_extractor import CompleteQRExtractor
 
@@ -23,7 +24,7 @@ def test_absolute_position_used_when_qr_xy_provided():
 
     positions = []
 
-    def capture_rect(rect, stream, overlay):
+    def capture_rect(rect, pixmap, overlay):
         positions.append((rect.x0, rect.y0))
 
     mock_page = MagicMock()
@@ -37,7 +38,8 @@ def test_absolute_position_used_when_qr_xy_provided():
     Image.new("RGB", (60, 70), "white").save(buf, format="PNG")
     box_image_bytes = buf.getvalue()
 
-    extractor._place_box_on_page(mock_page, box_image_bytes, qr_scale=1.0, qr_x=100, qr_y=200)
+    box_img = extractor._scale_box(box_image_bytes, qr_scale=1.0)
+    extractor._insert_box(mock_page, box_img, qr_x=100, qr_y=200)
 
     assert len(positions) == 1
     assert positions[0] == (100, 200)
@@ -49,7 +51,7 @@ def test_margin_position_used_when_no_qr_xy():
 
     positions = []
 
-    def capture_rect(rect, stream, overlay):
+    def capture_rect(rect, pixmap, overlay):
         positions.append((rect.x0, rect.y0))
 
     mock_page = MagicMock()
@@ -62,9 +64,10 @@ def test_margin_position_used_when_no_qr_xy():
     Image.new("RGB", (60, 70), "white").save(buf, format="PNG")
     box_image_bytes = buf.getvalue()
 
-    extractor._place_box_on_page(mock_page, box_image_bytes, qr_scale=1.0,
-                                  qr_position='right', qr_margin=20,
-                                  design_width=800, design_height=600)
+    box_img = extractor._scale_box(box_image_bytes, qr_scale=1.0)
+    extractor._insert_box(mock_page, box_img,
+                          qr_position='right', qr_margin=20,
+                          design_width=800, design_height=600)
 
     assert len(positions) == 1
     x, y = positions[0]
@@ -72,3 +75,55 @@ def test_margin_position_used_when_no_qr_xy():
     assert x == 720
     # y = 600 - 70 - 20 = 510
     assert y == 510
+
+
+def test_both_position_places_box_in_both_corners():
+    """qr_position='both' places the same box bottom-left and bottom-right."""
+    extractor = CompleteQRExtractor()
+
+    positions = []
+
+    def capture_rect(rect, pixmap, overlay):
+        positions.append((rect.x0, rect.y0))
+
+    mock_page = MagicMock()
+    mock_page.rect = MagicMock(width=800, height=600)
+    mock_page.insert_image = capture_rect
+
+    import io
+    from PIL import Image
+    buf = io.BytesIO()
+    Image.new("RGB", (60, 70), "white").save(buf, format="PNG")
+    box_image_bytes = buf.getvalue()
+
+    box_img = extractor._scale_box(box_image_bytes, qr_scale=1.0)
+    extractor._insert_box(mock_page, box_img,
+                          qr_position='both', qr_margin=20,
+                          design_width=800, design_height=600)
+
+    assert positions == [(20, 510), (720, 510)]
+
+
+def test_scaled_box_is_placed_at_its_scaled_size():
+    """qr_scale resizes the box once; corner placement uses the scaled size."""
+    extractor = CompleteQRExtractor()
+
+    positions = []
+
+    def capture_rect(rect, pixmap, overlay):
+        positions.append((rect.x0, rect.y0, rect.x1, rect.y1))
+
+    mock_page = MagicMock()
+    mock_page.rect = MagicMock(width=800, height=600)
+    mock_page.insert_image = capture_rect
+
+    from PIL import Image
+    box_img = extractor._scale_box(Image.new("RGB", (60, 70), "white"), qr_scale=0.5)
+    assert box_img.size == (30, 35)
+
+    extractor._insert_box(mock_page, box_img,
+                          qr_position='right', qr_margin=20,
+                          design_width=800, design_height=600)
+
+    # x = 800 - 30 - 20, y = 600 - 35 - 20
+    assert positions == [(750, 545, 780, 580)]
@@ -0,0 +1,67 @@
+import fitz
+import numpy as np
+import pytest
+
+import pdf_imaging
+
+
+@pytest.fixture
+def two_page_pdf(tmp_path):
+    path = tmp_path / "tickets.pdf"
+    doc = fitz.open()
+    doc.new_page()
+    doc.new_page()
+    doc.save(str(path))
+    doc.close()
+    return path
+
+
+def test_open_pdf_reads_memory_mapped_file(two_page_pdf):
+    doc = pdf_imaging.open_pdf(two_page_pdf)
+    assert len(doc) == 2
+    doc.close()
+
+
+def test_open_pdf_falls_back_to_path_without_memoryview_streams(two_page_pdf, monkeypatch):
+    """Older PyMuPDF raises TypeError for memoryview streams; open by path instead."""
+    real_open = fitz.open
+    calls = []
+
+    def old_open(*args, **kwargs):
+        calls.append((args, kwargs))
+        if isinstance(kwargs.get("stream"), memoryview):
+            raise TypeError("bad type: 'stream'")
+        return real_open(*args, **kwargs)
+
+    monkeypatch.setattr(pdf_imaging.fitz, "open", old_open)
+    doc = pdf_imaging.open_pdf(two_page_pdf)
+    assert len(doc) == 2
+    assert calls[-1] == ((two_page_pdf,), {})
+    doc.close()
+
+
+def test_reading_order_groups_codes_into_rows():
+    """A code slightly higher on the same row still reads after its left neighbour."""
+    rects = [
+        (400, 99, 120, 120),   # right, 1 pt higher
+        (50, 100, 120, 120),   # left
+        (50, 400, 120, 120),   # second row
+        (400, 398, 120, 120),
+    ]
+    assert list(pdf_imaging.reading_order(rects)) == [1, 0, 2, 3]
+
+
+def test_reading_order_handles_empty_and_single():
+    assert list(pdf_imaging.reading_order([])) == []
+    assert list(pdf_imaging.reading_order([(5, 5, 10, 10)])) == [0]
+
+
+def test_binarized_keeps_low_contrast_modules_on_a_white_page():
+    """The first tier is the fixed cut; Otsu would merge grey modules into one block."""
+    gray = np.full((1263, 893), 255, dtype=np.uint8)
+    yy, xx = np.indices((150, 150))
+    gray[150:300, 150:300] = np.where((yy // 6 + xx // 6) % 2, 100, 170)
+
+    fixed, otsu = list(pdf_imaging.binarized(gray))
+    assert set(np.unique(fixed[150:300, 150:300])) == {0, 255}
+    assert set(np.unique(otsu[150:300, 150:300])) == {0}
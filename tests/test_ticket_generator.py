@@ -0,0 +1,37 @@
+import fitz
+import numpy as np
+
+from ticket_generator import TicketGenerator
+
+
+def _numbered_pdf(path, pages):
+    """PDF whose page n has a black square whose x position depends on n."""
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        x = 60 + 12 * n
+        page.draw_rect(fitz.Rect(x, 100, x + 30, 130), color=None, fill=(0, 0, 0))
+    doc.save(str(path))
+    doc.close()
+
+
+def test_worker_processes_return_crops_in_page_order(tmp_path):
+    """workers > 1 renders the same scaled crops, in page order, as the serial path."""
+    pdf_path = tmp_path / "tickets.pdf"
+    _numbered_pdf(pdf_path, 6)
+    region = (50, 90, 120, 60)
+    gen = TicketGenerator()
+    doc = fitz.open(str(pdf_path))
+
+    serial = [np.asarray(img) for img in gen._crops(doc, pdf_path, region, 0.5, workers=1)]
+    pooled = [np.asarray(img) for img in gen._crops(doc, pdf_path, region, 0.5, workers=3)]
+    doc.close()
+
+    assert len(serial) == len(pooled) == 6
+    for a, b in zip(serial, pooled):
+        assert np.array_equal(a, b)
+    # 120x60 pt at 2x render, scaled by 0.5
+    assert serial[0].shape[:2] == (60, 120)
+    # Each page's square starts 12 pt (12 px after 2x then 0.5x) further right
+    first_dark = [int(np.argmax(crop.min(axis=(0, 2)) < 128)) for crop in serial]
+    assert first_dark == [10 + 12 * n for n in range(6)]
@@ -16,17 +16,47 @@ Usage:
 """
 
 import argparse
-import io
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 import fitz
 from PIL import Image, ImageDraw, ImageFont
 
+from pdf_imaging import open_pdf, resize_image, to_pixmap
+
+
+def _render_scaled_crop(page, region, qr_scale):
+    """Crop region (src_x, src_y, src_w, src_h) from a PDF page at 2× and scale it."""
+    src_x, src_y, src_w, src_h = region
+    clip = fitz.Rect(src_x, src_y, src_x + src_w, src_y + src_h)
+    pix = page.get_pixmap(clip=clip, matrix=fitz.Matrix(2, 2), alpha=False)
+    # Wrap the raw RGB samples directly; no PNG encode/decode round-trip
+    img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    new_w = max(1, int(img.width * qr_scale))
+    new_h = max(1, int(img.height * qr_scale))
+    return resize_image(img, (new_w, new_h))
+
+
+# Source PDF opened once per worker process by _init_worker
+_worker_doc = None
+
+
+def _init_worker(pdf_path):
+    global _worker_doc
+    _worker_doc = open_pdf(pdf_path)
+
+
+def _render_page_crop(page_num, region, qr_scale):
+    """Worker-process entry point: scaled crop of page_num of the worker's PDF."""
+    return _render_scaled_crop(_worker_doc[page_num], region, qr_scale)
+
 
 class TicketGenerator:
     def __init__(self, verbose=False):
         self.verbose = verbose
+        self._fonts = {}
 
     def log(self, msg):
         if self.verbose:
@@ -36,13 +66,31 @@ class TicketGenerator:
     # Internal helpers
     # ------------------------------------------------------------------
 
-    def _crop_region(self, page, src_x, src_y, src_w, src_h):
-        """Crop (src_x, src_y, src_w, src_h) from a PDF page at 2× resolution."""
-        clip = fitz.Rect(src_x, src_y, src_x + src_w, src_y + src_h)
-        pix = page.get_pixmap(clip=clip, matrix=fitz.Matrix(2, 2))
-        return pix.tobytes("png")
+    def _crops(self, doc, pdf_path, region, qr_scale, workers):
+        """Yield the scaled source crop of every page, in page order.
+
+        Rendering and resizing are CPU-bound and independent per page, so with
+        workers > 1 they run in separate processes (PyMuPDF holds the GIL and
+        is not thread-safe); each worker opens the PDF once.
+        """
+        if workers <= 1:
+            for page_num in range(len(doc)):
+                yield _render_scaled_crop(doc[page_num], region, qr_scale)
+            return
+
+        render = partial(_render_page_crop, region=region, qr_scale=qr_scale)
+        chunksize = max(1, len(doc) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(pdf_path,)) as executor:
+            yield from executor.map(render, range(len(doc)), chunksize=chunksize)
 
     def _load_font(self, size):
+        """Return the font for size, loading it on first use only."""
+        if size not in self._fonts:
+            self._fonts[size] = self._find_font(size)
+        return self._fonts[size]
+
+    def _find_font(self, size):
         for path in [
             "arial.ttf",
             "/System/Library/Fonts/Helvetica.ttc",
@@ -68,28 +116,19 @@ class TicketGenerator:
         pad = 4
         img = Image.new("RGBA", (tw + pad * 2, th + pad * 2), (255, 255, 255, 0))
         draw = ImageDraw.Draw(img)
-        for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-            draw.text((pad + dx, pad + dy), text, font=font, fill=(180, 180, 180, 255))
-        draw.text((pad, pad), text, font=font, fill=(0, 0, 0, 255))
+        # Text plus a 1px light outline, drawn in one pass
+        draw.text((pad, pad), text, font=font, fill=(0, 0, 0, 255),
+                  stroke_width=1, stroke_fill=(180, 180, 180, 255))
 
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        buf.seek(0)
         rect = fitz.Rect(num_x, num_y, num_x + tw + pad * 2, num_y + th + pad * 2)
-        out_page.insert_image(rect, stream=buf.read(), overlay=True)
+        out_page.insert_image(rect, pixmap=to_pixmap(img), overlay=True)
         self.log(f"  counter {text} at ({num_x}, {num_y})")
 
-    def _place_on_page(self, out_page, img_bytes, qr_x, qr_y, qr_scale):
-        """Scale img_bytes and overlay it at (qr_x, qr_y) on out_page."""
-        img = Image.open(io.BytesIO(img_bytes))
-        new_w = max(1, int(img.width * qr_scale))
-        new_h = max(1, int(img.height * qr_scale))
-        img = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-        buf = io.BytesIO()
-        img.save(buf, format="PNG")
-        buf.seek(0)
+    def _place_on_page(self, out_page, img, qr_x, qr_y):
+        """Overlay the already-scaled img at (qr_x, qr_y) on out_page."""
+        new_w, new_h = img.size
         rect = fitz.Rect(qr_x, qr_y, qr_x + new_w, qr_y + new_h)
-        out_page.insert_image(rect, stream=buf.read(), overlay=True)
+        out_page.insert_image(rect, pixmap=to_pixmap(img), overlay=True)
         self.log(f"  placed at ({qr_x}, {qr_y})  final size {new_w}×{new_h}")
 
     # ------------------------------------------------------------------
@@ -107,36 +146,43 @@ class TicketGenerator:
         start_number=1,
         num_x=None, num_y=None,
         num_font_size=48,
+        workers=None,
     ):
-        doc = fitz.open(pdf_path)
+        doc = open_pdf(pdf_path)
         design = Image.open(design_path).convert("RGBA")
         dw, dh = design.size
         self.log(f"Design: {dw}×{dh}  |  source region: ({src_x},{src_y}) {src_w}×{src_h}")
 
-        # Pre-render design to bytes once
-        design_buf = io.BytesIO()
-        design.save(design_buf, format="PNG")
-        design_bytes = design_buf.getvalue()
+        # Convert design to a pixmap once
+        design_pixmap = to_pixmap(design)
 
         output_doc = fitz.open()
         total = 0
+        design_xref = 0
 
-        for page_num in range(len(doc)):
-            self.log(f"Page {page_num + 1}/{len(doc)}")
-            page = doc[page_num]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        workers = min(workers, len(doc))
+        self.log(f"Rendering crops with {workers} worker process(es)")
+        crops = self._crops(doc, pdf_path, (src_x, src_y, src_w, src_h), qr_scale, workers)
 
-            crop_bytes = self._crop_region(page, src_x, src_y, src_w, src_h)
+        for page_num, crop in enumerate(crops):
+            self.log(f"Page {page_num + 1}/{len(doc)}")
             ticket_num = start_number + total
             total += 1
 
             out_page = output_doc.new_page(width=dw, height=dh)
-            out_page.insert_image(out_page.rect, stream=design_bytes, overlay=False)
-            self._place_on_page(out_page, crop_bytes, qr_x, qr_y, qr_scale)
+            # Embed the design once; later pages reuse its image xref
+            design_xref = out_page.insert_image(
+                out_page.rect, pixmap=design_pixmap, xref=design_xref, overlay=False
+            )
+            self._place_on_page(out_page, crop, qr_x, qr_y)
 
             if num_x is not None and num_y is not None:
                 self._draw_counter_on_page(out_page, ticket_num, num_x, num_y, num_font_size)
 
-        output_doc.save(output_path)
+        output_doc.save(output_path, garbage=4, deflate=True, deflate_images=True,
+                        deflate_fonts=True, clean=True)
         output_doc.close()
         doc.close()
         print(f"✅  {total} tickets → {output_path}")
@@ -167,6 +213,8 @@ def main():
     p.add_argument("--num-x", type=int, default=None, help="Counter number X on design (px)")
     p.add_argument("--num-y", type=int, default=None, help="Counter number Y on design (px)")
     p.add_argument("--num-font-size", type=int, default=48, help="Counter font size (default 48)")
+    p.add_argument("--workers", type=int, default=None,
+                   help="Worker processes for page rendering (default: CPU count, 1 disables)")
     p.add_argument("-v", "--verbose", action="store_true")
 
     args = p.parse_args()
@@ -180,6 +228,10 @@ def main():
         print("Error: --qr-scale must be positive")
         sys.exit(1)
 
+    if args.workers is not None and args.workers < 1:
+        print("Error: --workers must be at least 1")
+        sys.exit(1)
+
     out_dir = os.path.dirname(args.output)
     if out_dir:
         os.makedirs(out_dir, exist_ok=True)
@@ -195,6 +247,7 @@ def main():
             num_x=args.num_x,
             num_y=args.num_y,
             num_font_size=args.num_font_size,
+            workers=args.workers,
         )
     except Exception as e:
         print(f"❌  {e}")